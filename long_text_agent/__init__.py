@@ -1,15 +1,33 @@
 """长文本生成Agent包入口。
 
 该包提供基础Agent与配置对象，供外部直接导入使用。
+导出对象按需加载（PEP 562），仅在首次访问时导入对应子模块。
 """
 
-from .agent import LongTextAgent
-from .ast_grep_splitter import AstGrepConfig
-from .config import AgentConfig
-from .env_override import apply_env_overrides
-from .llm_client import LlmClientConfig
-from .perplexity import PerplexityConfig
-from .text_type import TextTypeConfig
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Dict
+
+if TYPE_CHECKING:
+    from .agent import LongTextAgent
+    from .ast_grep_config import AstGrepConfig
+    from .config import AgentConfig
+    from .env_override import apply_env_overrides
+    from .llm_config import LlmClientConfig
+    from .perplexity import PerplexityConfig
+    from .text_type import TextTypeConfig
+
+# 导出名到所在子模块的映射
+_LAZY_EXPORTS: Dict[str, str] = {
+    "LongTextAgent": ".agent",
+    "AgentConfig": ".config",
+    "AstGrepConfig": ".ast_grep_config",
+    "TextTypeConfig": ".text_type",
+    "LlmClientConfig": ".llm_config",
+    "PerplexityConfig": ".perplexity",
+    "apply_env_overrides": ".env_override",
+}
 
 __all__ = [
 	"LongTextAgent",
@@ -20,3 +38,40 @@ __all__ = [
 	"PerplexityConfig",
 	"apply_env_overrides",
 ]
+
+
+def __getattr__(name: str) -> object:
+    """按需加载导出对象。
+
+    参数:
+        name: 访问的属性名。
+
+    返回值:
+        对应子模块中的导出对象。
+
+    关键实现细节:
+        首次访问时导入子模块并写回包命名空间，后续访问不再经过该函数。
+    """
+
+    module_name: str | None = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError("模块 " + __name__ + " 不存在属性 " + name)
+    value: object = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """列出包的公开属性。
+
+    参数:
+        无。
+
+    返回值:
+        包含按需加载导出名的属性列表。
+
+    关键实现细节:
+        保证交互式补全能看到尚未加载的导出对象。
+    """
+
+    return sorted(set(globals()) | set(__all__))
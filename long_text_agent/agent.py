@@ -5,7 +5,7 @@
 
 from __future__ import annotations
 
-from typing import Dict
+from typing import Callable, List, Tuple
 
 from .checker import SelfChecker
 from .config import AgentConfig
@@ -17,6 +17,58 @@ from .stats import StatsBuilder
 from .types import Diagnostics, Metrics, Plan, Stats
 
 
+def _is_blank(value: str) -> bool:
+    """判断字符串是否为空或仅含空白。
+
+    参数:
+        value: 待检查字符串。
+
+    返回值:
+        是否为空白字符串。
+
+    关键实现细节:
+        使用 isspace 判定，避免 strip 为每次校验分配新字符串。
+    """
+
+    return value == "" or value.isspace()
+
+
+# 配置校验规则：(判定配置非法的条件, 错误信息)，按顺序检查
+_CONFIG_RULES: Tuple[Tuple[Callable[[AgentConfig], bool], str], ...] = (
+    (lambda cfg: cfg.max_chunk_chars <= 0, "max_chunk_chars必须为正数"),
+    (lambda cfg: cfg.overlap_chars < 0, "overlap_chars不能为负数"),
+    (lambda cfg: cfg.overlap_chars >= cfg.max_chunk_chars, "overlap_chars必须小于max_chunk_chars"),
+    (lambda cfg: cfg.summary_chars <= 0, "summary_chars必须为正数"),
+    (lambda cfg: cfg.ast_grep.enable and _is_blank(cfg.ast_grep.command), "ast_grep.command不能为空"),
+    (lambda cfg: cfg.ast_grep.enable and _is_blank(cfg.ast_grep.language), "ast_grep.language不能为空"),
+    (lambda cfg: cfg.ast_grep.enable and len(cfg.ast_grep.patterns) == 0, "ast_grep.patterns不能为空"),
+    (lambda cfg: cfg.text_type.min_score <= 0, "text_type.min_score必须为正数"),
+    (lambda cfg: cfg.text_type.line_ratio_divisor <= 0, "text_type.line_ratio_divisor必须为正数"),
+    (lambda cfg: cfg.text_type.keyword_weight <= 0, "text_type.keyword_weight必须为正数"),
+    (lambda cfg: cfg.text_type.symbol_weight <= 0, "text_type.symbol_weight必须为正数"),
+    (lambda cfg: cfg.text_type.line_weight <= 0, "text_type.line_weight必须为正数"),
+    (lambda cfg: _is_blank(cfg.text_type.keyword_pattern), "text_type.keyword_pattern不能为空"),
+    (lambda cfg: _is_blank(cfg.text_type.symbol_pattern), "text_type.symbol_pattern不能为空"),
+    (lambda cfg: _is_blank(cfg.text_type.line_start_pattern), "text_type.line_start_pattern不能为空"),
+    (lambda cfg: _is_blank(cfg.text_type.call_like_pattern), "text_type.call_like_pattern不能为空"),
+    (lambda cfg: _is_blank(cfg.text_type.comment_pattern), "text_type.comment_pattern不能为空"),
+    (
+        lambda cfg: any(_is_blank(keyword) for keyword in cfg.text_type.fast_path_keywords),
+        "text_type.fast_path_keywords不能包含空白项",
+    ),
+    (lambda cfg: cfg.llm_client.enable and _is_blank(cfg.llm_client.base_url), "llm_client.base_url不能为空"),
+    (lambda cfg: cfg.llm_client.enable and _is_blank(cfg.llm_client.api_key_env), "llm_client.api_key_env不能为空"),
+    (lambda cfg: cfg.llm_client.enable and _is_blank(cfg.llm_client.model), "llm_client.model不能为空"),
+    (lambda cfg: cfg.llm_client.enable and cfg.llm_client.timeout_seconds <= 0, "llm_client.timeout_seconds必须为正数"),
+    (lambda cfg: cfg.llm_client.enable and cfg.llm_client.max_retries < 0, "llm_client.max_retries不能为负数"),
+    (lambda cfg: cfg.llm_client.enable and cfg.llm_client.max_concurrency <= 0, "llm_client.max_concurrency必须为正数"),
+    (lambda cfg: cfg.llm_client.enable and cfg.llm_client.cache_size < 0, "llm_client.cache_size不能为负数"),
+    (lambda cfg: cfg.perplexity.enable and _is_blank(cfg.perplexity.endpoint), "perplexity.endpoint不能为空"),
+    (lambda cfg: cfg.perplexity.enable and _is_blank(cfg.perplexity.text_field), "perplexity.text_field不能为空"),
+    (lambda cfg: cfg.perplexity.enable and _is_blank(cfg.perplexity.logprobs_field), "perplexity.logprobs_field不能为空"),
+)
+
+
 class LongTextAgent:
     """长文本生成基础Agent。
 
@@ -49,8 +101,15 @@ class LongTextAgent:
         self._planner: PlanBuilder = PlanBuilder(config)
         self._llm_client: LlmClient = LlmClient(config.llm_client)
         self._generator: TextGenerator = TextGenerator(self._llm_client, config.llm_client.enable)
-        self._checker: SelfChecker = SelfChecker(self._llm_client, config.perplexity)
+        self._checker: SelfChecker = SelfChecker(
+            self._llm_client,
+            config.perplexity,
+            config.exact_unicode_ratio,
+        )
         self._stats_builder: StatsBuilder = StatsBuilder()
+        self._fuse_scoring: bool = (
+            config.enable_self_check and config.llm_client.enable and config.perplexity.enable
+        )
 
     def run(self, instruction: str, context_text: str, return_diagnostics: bool) -> Diagnostics:
         """执行长文本生成流程。
@@ -75,15 +134,22 @@ class LongTextAgent:
         # 第二阶段：结构规划
         plan: Plan = self._planner.build_plan(instruction, chunks)
 
-        # 第三阶段：生成输出
-        output_text: str = self._generator.generate_text(instruction, plan)
+        # 第三阶段：生成输出（需要困惑度时随生成请求一并取回对数概率）
+        output_text: str
+        logprobs: List[float] | None = None
+        if self._fuse_scoring:
+            output_text, logprobs = self._generator.generate_text_with_logprobs(
+                plan,
+                self._config.perplexity.logprobs_field,
+            )
+        else:
+            output_text = self._generator.generate_text(instruction, plan)
 
         # 第四阶段：自检与诊断
         metrics: Metrics = {}
-        stats: Stats = {}
         if self._config.enable_self_check:
-            metrics = self._checker.self_check(output_text)
-        stats = self._stats_builder.build_stats(chunks, output_text)
+            metrics = self._checker.self_check(output_text, logprobs)
+        stats: Stats = self._stats_builder.build_stats(chunks, output_text)
 
         if return_diagnostics:
             return {
@@ -106,62 +172,13 @@ class LongTextAgent:
             无。
 
         关键实现细节:
-            关键维度必须满足正数与边界约束，避免分块策略失效。
+            关键维度必须满足正数与边界约束，避免分块策略失效；规则集中定义于 _CONFIG_RULES，
+            按顺序检查并在首个违规处抛出。
         """
 
-        if config.max_chunk_chars <= 0:
-            raise ValueError("max_chunk_chars必须为正数")
-        if config.overlap_chars < 0:
-            raise ValueError("overlap_chars不能为负数")
-        if config.overlap_chars >= config.max_chunk_chars:
-            raise ValueError("overlap_chars必须小于max_chunk_chars")
-        if config.summary_chars <= 0:
-            raise ValueError("summary_chars必须为正数")
-        if config.ast_grep.enable:
-            if config.ast_grep.command.strip() == "":
-                raise ValueError("ast_grep.command不能为空")
-            if config.ast_grep.language.strip() == "":
-                raise ValueError("ast_grep.language不能为空")
-            if len(config.ast_grep.patterns) == 0:
-                raise ValueError("ast_grep.patterns不能为空")
-        if config.text_type.min_score <= 0:
-            raise ValueError("text_type.min_score必须为正数")
-        if config.text_type.line_ratio_divisor <= 0:
-            raise ValueError("text_type.line_ratio_divisor必须为正数")
-        if config.text_type.keyword_weight <= 0:
-            raise ValueError("text_type.keyword_weight必须为正数")
-        if config.text_type.symbol_weight <= 0:
-            raise ValueError("text_type.symbol_weight必须为正数")
-        if config.text_type.line_weight <= 0:
-            raise ValueError("text_type.line_weight必须为正数")
-        if config.text_type.keyword_pattern.strip() == "":
-            raise ValueError("text_type.keyword_pattern不能为空")
-        if config.text_type.symbol_pattern.strip() == "":
-            raise ValueError("text_type.symbol_pattern不能为空")
-        if config.text_type.line_start_pattern.strip() == "":
-            raise ValueError("text_type.line_start_pattern不能为空")
-        if config.text_type.call_like_pattern.strip() == "":
-            raise ValueError("text_type.call_like_pattern不能为空")
-        if config.text_type.comment_pattern.strip() == "":
-            raise ValueError("text_type.comment_pattern不能为空")
-        if config.llm_client.enable:
-            if config.llm_client.base_url.strip() == "":
-                raise ValueError("llm_client.base_url不能为空")
-            if config.llm_client.api_key_env.strip() == "":
-                raise ValueError("llm_client.api_key_env不能为空")
-            if config.llm_client.model.strip() == "":
-                raise ValueError("llm_client.model不能为空")
-            if config.llm_client.timeout_seconds <= 0:
-                raise ValueError("llm_client.timeout_seconds必须为正数")
-            if config.llm_client.max_retries < 0:
-                raise ValueError("llm_client.max_retries不能为负数")
-        if config.perplexity.enable:
-            if config.perplexity.endpoint.strip() == "":
-                raise ValueError("perplexity.endpoint不能为空")
-            if config.perplexity.text_field.strip() == "":
-                raise ValueError("perplexity.text_field不能为空")
-            if config.perplexity.logprobs_field.strip() == "":
-                raise ValueError("perplexity.logprobs_field不能为空")
+        for is_invalid, message in _CONFIG_RULES:
+            if is_invalid(config):
+                raise ValueError(message)
 
     def _validate_inputs(self, instruction: str, context_text: str) -> None:
         """校验输入有效性。
@@ -0,0 +1,47 @@
+"""AST-GREP配置。
+
+该模块定义AST-GREP语义拆分的配置结构，不依赖子进程等运行时模块，仅构建配置时无需加载拆分器实现。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(frozen=True)
+class AstGrepConfig:
+    """AST-GREP配置。
+
+    参数:
+        enable: 是否启用AST-GREP语义拆分。
+        command: AST-GREP命令行入口（例如sg）。
+        language: 代码语言标识（例如python、javascript）。
+        patterns: 用于匹配语法节点的模式元组，传入列表时在初始化后转换为元组。
+
+    返回值:
+        不直接返回，作为配置对象供拆分器使用。
+
+    关键实现细节:
+        patterns必须非空，否则无法构建语义拆分范围；以元组保存，使冻结配置真正不可变且可哈希。
+    """
+
+    enable: bool
+    command: str
+    language: str
+    patterns: Tuple[str, ...]
+
+    def __post_init__(self) -> None:
+        """规范化模式集合。
+
+        参数:
+            无。
+
+        返回值:
+            无。
+
+        关键实现细节:
+            冻结数据类需通过 object.__setattr__ 写入转换后的元组。
+        """
+
+        object.__setattr__(self, "patterns", tuple(self.patterns))
@@ -5,35 +5,17 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
 import json
-import os
 import subprocess
-import tempfile
 from typing import Dict, List, Tuple
 
+from .ast_grep_config import AstGrepConfig
+from .cache import LruCache, text_digest
 
-@dataclass(frozen=True)
-class AstGrepConfig:
-    """AST-GREP配置。
-
-    参数:
-        enable: 是否启用AST-GREP语义拆分。
-        command: AST-GREP命令行入口（例如sg）。
-        language: 代码语言标识（例如python、javascript）。
-        patterns: 用于匹配语法节点的模式列表。
-
-    返回值:
-        不直接返回，作为配置对象供拆分器使用。
-
-    关键实现细节:
-        patterns必须非空，否则无法构建语义拆分范围。
-    """
-
-    enable: bool
-    command: str
-    language: str
-    patterns: List[str]
+# 切块结果缓存容量：同一文本重复拆分时免去外部命令调用
+_SPLIT_CACHE_SIZE: int = 64
+# 只读空字典哨兵：匹配结果缺少字段时复用，避免每次创建新字典，禁止修改
+_EMPTY: Dict[str, object] = {}
 
 
 class AstGrepSplitter:
@@ -59,10 +41,11 @@ class AstGrepSplitter:
             无。
 
         关键实现细节:
-            仅保存配置，不在初始化阶段执行外部命令。
+            仅保存配置并初始化切块缓存，不在初始化阶段执行外部命令。
         """
 
         self._config: AstGrepConfig = config
+        self._split_cache: LruCache[List[str]] = LruCache(_SPLIT_CACHE_SIZE)
 
     def split(self, text: str) -> List[str]:
         """基于AST-GREP进行语义拆分。
@@ -74,14 +57,22 @@ class AstGrepSplitter:
             语义切块列表。
 
         关键实现细节:
-            对多模式结果进行合并排序，并依据范围切分原始文本。
+            对多模式结果进行合并排序，并依据范围切分原始文本；结果按语言、模式与文本摘要缓存，
+            命中时返回副本，避免调用方修改缓存内容。
         """
 
+        cache_key: bytes = text_digest(self._config.language, *self._config.patterns, text)
+        cached_chunks: List[str] | None = self._split_cache.get(cache_key)
+        if cached_chunks is not None:
+            return list(cached_chunks)
+
+        chunks: List[str] = []
         matches: List[Tuple[int, int]] = self._collect_matches(text)
-        if len(matches) == 0:
-            return []
-        merged: List[Tuple[int, int]] = self._merge_ranges(matches)
-        return [text[start:end] for start, end in merged if end > start]
+        if len(matches) > 0:
+            merged: List[Tuple[int, int]] = self._merge_ranges(matches)
+            chunks = [text[start:end] for start, end in merged if end > start]
+        self._split_cache.put(cache_key, chunks)
+        return list(chunks)
 
     def _collect_matches(self, text: str) -> List[Tuple[int, int]]:
         """收集AST-GREP匹配范围。
@@ -93,70 +84,80 @@ class AstGrepSplitter:
             匹配范围列表，使用字符索引区间表示。
 
         关键实现细节:
-            每个pattern独立执行，结果汇总后统一排序。
+            所有pattern在一次命令调用中完成匹配，结果汇总后统一排序；范围字段只读访问，不做字典拷贝。
         """
 
         offsets: List[int] = self._build_line_offsets(text)
         matches: List[Tuple[int, int]] = []
-        for pattern in self._config.patterns:
-            data: Dict[str, object] = self._run_ast_grep(pattern, text)
-            raw_matches: List[Dict[str, object]] = list(data.get("matches", []))
-            for item in raw_matches:
-                range_data: Dict[str, object] = dict(item.get("range", {}))
-                start_data: Dict[str, object] = dict(range_data.get("start", {}))
-                end_data: Dict[str, object] = dict(range_data.get("end", {}))
-                start_index: int = self._to_index(offsets, start_data)
-                end_index: int = self._to_index(offsets, end_data)
-                if end_index > start_index:
-                    matches.append((start_index, end_index))
+        for item in self._run_ast_grep_all(text):
+            range_data: Dict[str, object] = item.get("range", _EMPTY)
+            start_data: Dict[str, object] = range_data.get("start", _EMPTY)
+            end_data: Dict[str, object] = range_data.get("end", _EMPTY)
+            start_index: int = self._to_index(offsets, start_data)
+            end_index: int = self._to_index(offsets, end_data)
+            if end_index > start_index:
+                matches.append((start_index, end_index))
         return matches
 
-    def _run_ast_grep(self, pattern: str, text: str) -> Dict[str, object]:
-        """执行AST-GREP命令并返回JSON结果。
+    def _build_inline_rules(self) -> str:
+        """将全部pattern构建为AST-GREP内联规则。
+
+        参数:
+            无。
+
+        返回值:
+            以YAML文档分隔符连接的规则文本。
+
+        关键实现细节:
+            每个pattern对应一条规则，pattern以JSON字符串形式写入以避免YAML转义问题。
+        """
+
+        rules: List[str] = []
+        for index, pattern in enumerate(self._config.patterns):
+            rules.append(
+                "id: pattern-" + str(index) + "\n"
+                + "language: " + self._config.language + "\n"
+                + "rule:\n"
+                + "  pattern: " + json.dumps(pattern) + "\n"
+            )
+        return "---\n".join(rules)
+
+    def _run_ast_grep_all(self, text: str) -> List[Dict[str, object]]:
+        """执行一次AST-GREP命令并返回全部匹配结果。
 
         参数:
-            pattern: AST-GREP匹配模式。
             text: 待拆分文本。
 
         返回值:
-            AST-GREP返回的JSON数据。
+            AST-GREP返回的匹配对象列表。
 
         关键实现细节:
-            使用临时文件作为输入，确保命令行工具兼容。
+            通过 scan --inline-rules 一次携带全部pattern，并经由stdin传入文本，
+            避免逐pattern的进程创建与临时文件读写；输出为逐行JSON。
         """
 
-        temp_path: str = ""
+        command: List[str] = [
+            self._config.command,
+            "scan",
+            "--inline-rules",
+            self._build_inline_rules(),
+            "--json=stream",
+            "--stdin",
+        ]
         try:
-            with tempfile.NamedTemporaryFile(mode="w", encoding="utf-8", delete=False) as temp_file:
-                temp_file.write(text)
-                temp_path = temp_file.name
-
-            command: List[str] = [
-                self._config.command,
-                "--json",
-                "-p",
-                pattern,
-                "--lang",
-                self._config.language,
-                temp_path,
-            ]
             result: subprocess.CompletedProcess[str] = subprocess.run(
                 command,
+                input=text,
                 check=False,
                 capture_output=True,
                 text=True,
+                encoding="utf-8",
             )
-            if result.returncode != 0:
-                raise RuntimeError("AST-GREP执行失败: " + result.stderr.strip())
-            return json.loads(result.stdout)
         except FileNotFoundError as exc:
             raise RuntimeError("未找到AST-GREP命令: " + self._config.command) from exc
-        finally:
-            if temp_path != "":
-                try:
-                    os.remove(temp_path)
-                except OSError:
-                    pass
+        if result.returncode != 0:
+            raise RuntimeError("AST-GREP执行失败: " + result.stderr.strip())
+        return [json.loads(line) for line in result.stdout.splitlines() if line.strip() != ""]
 
     def _build_line_offsets(self, text: str) -> List[int]:
         """构建行起始偏移。
@@ -168,16 +169,20 @@ class AstGrepSplitter:
             每行起始字符索引列表。
 
         关键实现细节:
-            保留换行符长度，确保行列转字符索引准确。
+            以 str.find 逐个定位换行符，只生成整数偏移而不切出行子串；行边界仅认 \n，
+            与AST-GREP的行号计数一致。文本以换行结尾时末尾偏移不对应新行，予以去除；
+            否则追加文本长度作为末尾偏移。
         """
 
-        offsets: List[int] = []
-        current_index: int = 0
-        for line in text.splitlines(keepends=True):
-            offsets.append(current_index)
-            current_index += len(line)
-        if text.endswith("\n") is False:
-            offsets.append(current_index)
+        offsets: List[int] = [0]
+        position: int = text.find("\n")
+        while position != -1:
+            offsets.append(position + 1)
+            position = text.find("\n", position + 1)
+        if text.endswith("\n"):
+            offsets.pop()
+        elif text != "":
+            offsets.append(len(text))
         return offsets
 
     def _to_index(self, offsets: List[int], location: Dict[str, object]) -> int:
@@ -211,18 +216,21 @@ class AstGrepSplitter:
             合并后的范围列表。
 
         关键实现细节:
-            按起始位置排序后线性合并。
+            直接按元组排序（首元素即起始位置，无需键函数回调），合并时以局部变量跟踪当前区间，
+            仅在出现间隙时写入结果，避免反复替换列表尾元素。
         """
 
-        sorted_ranges: List[Tuple[int, int]] = sorted(ranges, key=lambda item: item[0])
+        if len(ranges) == 0:
+            return []
+        sorted_ranges: List[Tuple[int, int]] = sorted(ranges)
         merged: List[Tuple[int, int]] = []
-        for start, end in sorted_ranges:
-            if len(merged) == 0:
-                merged.append((start, end))
-                continue
-            last_start, last_end = merged[-1]
-            if start <= last_end:
-                merged[-1] = (last_start, max(last_end, end))
+        current_start, current_end = sorted_ranges[0]
+        for start, end in sorted_ranges[1:]:
+            if start <= current_end:
+                if end > current_end:
+                    current_end = end
             else:
-                merged.append((start, end))
+                merged.append((current_start, current_end))
+                current_start, current_end = start, end
+        merged.append((current_start, current_end))
         return merged
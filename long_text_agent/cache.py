@@ -0,0 +1,108 @@
+"""进程内缓存模块。
+
+该模块提供以内容摘要为键的有界LRU缓存，供开销较大的外部调用复用结果。
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import threading
+from typing import Generic, TypeVar
+
+_CachedValue = TypeVar("_CachedValue")
+
+
+def text_digest(*parts: str) -> bytes:
+    """计算文本片段的内容摘要。
+
+    参数:
+        parts: 参与摘要的文本片段。
+
+    返回值:
+        16字节的blake2b摘要。
+
+    关键实现细节:
+        片段之间以NUL分隔，避免不同切分方式拼接后产生相同键；
+        以摘要而非原文作为键，使缓存内存占用与文本长度无关。
+    """
+
+    hasher = hashlib.blake2b(digest_size=16)
+    for index, part in enumerate(parts):
+        if index > 0:
+            hasher.update(b"\x00")
+        hasher.update(part.encode("utf-8"))
+    return hasher.digest()
+
+
+class LruCache(Generic[_CachedValue]):
+    """有界LRU缓存。
+
+    参数:
+        max_entries: 最大缓存条目数。
+
+    返回值:
+        提供按摘要键读写缓存的能力。
+
+    关键实现细节:
+        基于OrderedDict维护访问顺序，超出容量时淘汰最久未使用的条目；
+        读写均在锁内完成，可在线程池中共享。
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """初始化缓存。
+
+        参数:
+            max_entries: 最大缓存条目数，必须为正数。
+
+        返回值:
+            无。
+
+        关键实现细节:
+            容量非法时直接抛出异常，避免缓存静默失效。
+        """
+
+        if max_entries <= 0:
+            raise ValueError("max_entries必须为正数")
+        self._max_entries: int = max_entries
+        self._entries: OrderedDict[bytes, _CachedValue] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, key: bytes) -> _CachedValue | None:
+        """读取缓存条目。
+
+        参数:
+            key: 摘要键。
+
+        返回值:
+            命中时返回缓存值，否则返回None。
+
+        关键实现细节:
+            命中时将条目移至队尾，标记为最近使用。
+        """
+
+        with self._lock:
+            value: _CachedValue | None = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: bytes, value: _CachedValue) -> None:
+        """写入缓存条目。
+
+        参数:
+            key: 摘要键。
+            value: 缓存值。
+
+        返回值:
+            无。
+
+        关键实现细节:
+            写入后若超出容量，淘汰队首的最久未使用条目。
+        """
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
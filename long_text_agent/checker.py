@@ -5,10 +5,16 @@
 
 from __future__ import annotations
 
+from typing import List
+
+from .cache import LruCache, text_digest
 from .llm_client import LlmClient
-from .perplexity import PerplexityConfig
+from .perplexity import PerplexityConfig, compute_perplexity
 from .types import Metrics
 
+# 困惑度缓存容量：以输出文本摘要为键，重复自检同一文本时免去网络请求
+_PERPLEXITY_CACHE_SIZE: int = 256
+
 
 class SelfChecker:
     """自检器。
@@ -16,6 +22,7 @@ class SelfChecker:
     参数:
         client: LLM客户端。
         perplexity_config: 困惑度配置。
+        exact_unicode_ratio: 去重比例是否按Unicode字符精确计算。
 
     返回值:
         提供自检指标计算能力。
@@ -24,52 +31,97 @@ class SelfChecker:
         提供重复率与长度等基础指标，便于后续扩展。
     """
 
-    def __init__(self, client: LlmClient, perplexity_config: PerplexityConfig) -> None:
+    def __init__(
+        self,
+        client: LlmClient,
+        perplexity_config: PerplexityConfig,
+        exact_unicode_ratio: bool,
+    ) -> None:
         """初始化自检器。
 
         参数:
             client: LLM客户端。
             perplexity_config: 困惑度配置。
+            exact_unicode_ratio: 去重比例是否按Unicode字符精确计算。
 
         返回值:
             无。
 
         关键实现细节:
-            保留客户端与配置用于可选的困惑度计算。
+            保留客户端与配置用于可选的困惑度计算，并初始化困惑度缓存。
         """
 
         self._client: LlmClient = client
         self._perplexity_config: PerplexityConfig = perplexity_config
+        self._exact_unicode_ratio: bool = exact_unicode_ratio
+        self._perplexity_cache: LruCache[float] = LruCache(_PERPLEXITY_CACHE_SIZE)
 
-    def self_check(self, output_text: str) -> Metrics:
+    def self_check(self, output_text: str, logprobs: List[float] | None) -> Metrics:
         """对输出进行简单自检。
 
         参数:
             output_text: 生成文本。
+            logprobs: 生成响应附带的token对数概率，为None时单独请求困惑度端点。
 
         返回值:
             自检指标字典。
 
         关键实现细节:
-            使用字符级去重比例作为基础重复度指标。
+            默认以UTF-8字节级去重比例（unique_byte_ratio）作为基础重复度指标，去重集合至多256个
+            元素；精确模式下使用字符级去重比例（unique_ratio）；困惑度优先使用生成时附带的
+            对数概率在本地计算，并通过 perplexity_source 标注来源。
         """
 
         length_value: int = len(output_text)
-        unique_chars: int = len(set(output_text))
-        unique_ratio: float = 0.0
-        if length_value > 0:
-            unique_ratio = unique_chars / float(length_value)
-        metrics: Metrics = {
-            "length": length_value,
-            "unique_ratio": unique_ratio,
-            "self_check": "basic",
-        }
+        metrics: Metrics = {"length": length_value}
+        if self._exact_unicode_ratio:
+            unique_ratio: float = 0.0
+            if length_value > 0:
+                unique_ratio = len(set(output_text)) / float(length_value)
+            metrics["unique_ratio"] = unique_ratio
+        else:
+            encoded_text: bytes = output_text.encode("utf-8")
+            unique_byte_ratio: float = 0.0
+            if len(encoded_text) > 0:
+                unique_byte_ratio = len(set(encoded_text)) / float(len(encoded_text))
+            metrics["unique_byte_ratio"] = unique_byte_ratio
+        metrics["self_check"] = "basic"
         if self._perplexity_config.enable:
-            perplexity_value: float = self._client.score_perplexity(
-                endpoint=self._perplexity_config.endpoint,
-                text_field=self._perplexity_config.text_field,
-                logprobs_field=self._perplexity_config.logprobs_field,
-                text=output_text,
-            )
-            metrics["perplexity"] = perplexity_value
+            if logprobs is not None:
+                metrics["perplexity"] = compute_perplexity(logprobs)
+                metrics["perplexity_source"] = "generation"
+            else:
+                metrics["perplexity"] = self._score_endpoint(output_text)
+                metrics["perplexity_source"] = "endpoint"
         return metrics
+
+    def _score_endpoint(self, output_text: str) -> float:
+        """通过困惑度端点打分，并按文本摘要缓存结果。
+
+        参数:
+            output_text: 生成文本。
+
+        返回值:
+            困惑度数值。
+
+        关键实现细节:
+            缓存键为端点、字段名与文本的blake2b摘要，命中时不再发起网络请求。
+        """
+
+        cache_key: bytes = text_digest(
+            self._perplexity_config.endpoint,
+            self._perplexity_config.text_field,
+            self._perplexity_config.logprobs_field,
+            output_text,
+        )
+        cached_value: float | None = self._perplexity_cache.get(cache_key)
+        if cached_value is not None:
+            return cached_value
+        perplexity_value: float = self._client.score_perplexity(
+            endpoint=self._perplexity_config.endpoint,
+            text_field=self._perplexity_config.text_field,
+            logprobs_field=self._perplexity_config.logprobs_field,
+            text=output_text,
+        )
+        self._perplexity_cache.put(cache_key, perplexity_value)
+        return perplexity_value
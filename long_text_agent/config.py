@@ -7,8 +7,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from .ast_grep_splitter import AstGrepConfig
-from .llm_client import LlmClientConfig
+from .ast_grep_config import AstGrepConfig
+from .llm_config import LlmClientConfig
 from .perplexity import PerplexityConfig
 from .text_type import TextTypeConfig
 
@@ -23,6 +23,7 @@ class AgentConfig:
         enable_overlap: 是否启用重叠策略。
         summary_chars: 规划阶段摘要长度。
         enable_self_check: 是否启用自检。
+        exact_unicode_ratio: 去重比例是否按Unicode字符精确计算，为False时按UTF-8字节近似。
         ast_grep: AST-GREP语义拆分配置。
         text_type: 文本类型检测配置。
         llm_client: LLM客户端配置。
@@ -40,6 +41,7 @@ class AgentConfig:
     enable_overlap: bool
     summary_chars: int
     enable_self_check: bool
+    exact_unicode_ratio: bool
     ast_grep: AstGrepConfig
     text_type: TextTypeConfig
     llm_client: LlmClientConfig
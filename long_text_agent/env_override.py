@@ -5,14 +5,53 @@
 
 from __future__ import annotations
 
+from dataclasses import replace
 import os
-from typing import List, Optional
+from typing import Callable, Dict, Tuple
 
-from .ast_grep_splitter import AstGrepConfig
 from .config import AgentConfig
-from .llm_client import LlmClientConfig
-from .perplexity import PerplexityConfig
-from .text_type import TextTypeConfig
+
+# 环境变量覆盖表：(环境变量名, 配置段, 字段名, 取值类型)，配置段为空字符串表示AgentConfig顶层字段
+_ENV_SPEC: Tuple[Tuple[str, str, str, str], ...] = (
+    ("MAX_CHUNK_CHARS", "", "max_chunk_chars", "int"),
+    ("OVERLAP_CHARS", "", "overlap_chars", "int"),
+    ("ENABLE_OVERLAP", "", "enable_overlap", "bool"),
+    ("SUMMARY_CHARS", "", "summary_chars", "int"),
+    ("ENABLE_SELF_CHECK", "", "enable_self_check", "bool"),
+    ("EXACT_UNICODE_RATIO", "", "exact_unicode_ratio", "bool"),
+    ("AST_GREP_ENABLE", "ast_grep", "enable", "bool"),
+    ("AST_GREP_COMMAND", "ast_grep", "command", "str"),
+    ("AST_GREP_LANGUAGE", "ast_grep", "language", "str"),
+    ("AST_GREP_PATTERNS", "ast_grep", "patterns", "tuple"),
+    ("TEXT_TYPE_MIN_SCORE", "text_type", "min_score", "int"),
+    ("TEXT_TYPE_LINE_RATIO_DIVISOR", "text_type", "line_ratio_divisor", "int"),
+    ("TEXT_TYPE_KEYWORD_WEIGHT", "text_type", "keyword_weight", "int"),
+    ("TEXT_TYPE_SYMBOL_WEIGHT", "text_type", "symbol_weight", "int"),
+    ("TEXT_TYPE_LINE_WEIGHT", "text_type", "line_weight", "int"),
+    ("TEXT_TYPE_KEYWORD_PATTERN", "text_type", "keyword_pattern", "str"),
+    ("TEXT_TYPE_SYMBOL_PATTERN", "text_type", "symbol_pattern", "str"),
+    ("TEXT_TYPE_LINE_START_PATTERN", "text_type", "line_start_pattern", "str"),
+    ("TEXT_TYPE_CALL_LIKE_PATTERN", "text_type", "call_like_pattern", "str"),
+    ("TEXT_TYPE_COMMENT_PATTERN", "text_type", "comment_pattern", "str"),
+    ("TEXT_TYPE_FAST_PATH_KEYWORDS", "text_type", "fast_path_keywords", "tuple"),
+    ("LLM_ENABLE", "llm_client", "enable", "bool"),
+    ("LLM_BASE_URL", "llm_client", "base_url", "str"),
+    ("LLM_API_KEY_ENV", "llm_client", "api_key_env", "str"),
+    ("LLM_MODEL", "llm_client", "model", "str"),
+    ("LLM_TIMEOUT_SECONDS", "llm_client", "timeout_seconds", "int"),
+    ("LLM_MAX_RETRIES", "llm_client", "max_retries", "int"),
+    ("LLM_MAX_CONCURRENCY", "llm_client", "max_concurrency", "int"),
+    ("LLM_CACHE_SIZE", "llm_client", "cache_size", "int"),
+    ("LLM_GENERATE_PATH", "llm_client", "generate_path", "str"),
+    ("LLM_AUTH_TYPE", "llm_client", "auth_type", "str"),
+    ("PERPLEXITY_ENABLE", "perplexity", "enable", "bool"),
+    ("PERPLEXITY_ENDPOINT", "perplexity", "endpoint", "str"),
+    ("PERPLEXITY_TEXT_FIELD", "perplexity", "text_field", "str"),
+    ("PERPLEXITY_LOGPROBS_FIELD", "perplexity", "logprobs_field", "str"),
+)
+
+# 嵌套配置段，按AgentConfig字段名组织
+_SECTIONS: Tuple[str, ...] = ("ast_grep", "text_type", "llm_client", "perplexity")
 
 
 def apply_env_overrides(config: AgentConfig) -> AgentConfig:
@@ -25,207 +64,140 @@ def apply_env_overrides(config: AgentConfig) -> AgentConfig:
         覆盖后的AgentConfig配置对象。
 
     关键实现细节:
-        仅在环境变量存在时覆盖，避免引入隐式默认值。
+        仅在环境变量存在时覆盖，避免引入隐式默认值；入口处对 os.environ 做一次快照，
+        后续查找均为普通字典访问，且同一次调用内读取结果一致。
+        第一阶段：按覆盖表单次遍历，将取值归入各配置段。
+        第二阶段：处理Anthropic基础URL的优先级规则。
+        第三阶段：通过 dataclasses.replace 生成新的冻结配置对象。
     """
 
-    ast_grep: AstGrepConfig = _override_ast_grep(config.ast_grep)
-    text_type: TextTypeConfig = _override_text_type(config.text_type)
-    llm_client: LlmClientConfig = _override_llm_client(config.llm_client)
-    perplexity: PerplexityConfig = _override_perplexity(config.perplexity)
-
-    return AgentConfig(
-        max_chunk_chars=_override_int("MAX_CHUNK_CHARS", config.max_chunk_chars),
-        overlap_chars=_override_int("OVERLAP_CHARS", config.overlap_chars),
-        enable_overlap=_override_bool("ENABLE_OVERLAP", config.enable_overlap),
-        summary_chars=_override_int("SUMMARY_CHARS", config.summary_chars),
-        enable_self_check=_override_bool("ENABLE_SELF_CHECK", config.enable_self_check),
-        ast_grep=ast_grep,
-        text_type=text_type,
-        llm_client=llm_client,
-        perplexity=perplexity,
-    )
-
-
-def _override_ast_grep(config: AstGrepConfig) -> AstGrepConfig:
-    """覆盖AST-GREP配置。
+    env: Dict[str, str] = dict(os.environ)
+
+    # 第一阶段：按覆盖表收集覆盖值
+    overrides: Dict[str, Dict[str, object]] = {"": {}}
+    for section in _SECTIONS:
+        overrides[section] = {}
+    for env_key, section, field_name, kind in _ENV_SPEC:
+        raw: str | None = env.get(env_key)
+        if raw is None:
+            continue
+        value: object | None = _COERCERS[kind](raw)
+        if value is None:
+            continue
+        overrides[section][field_name] = value
+
+    # 第二阶段：Anthropic基础URL优先于 LLM_BASE_URL
+    anthropic_base_url: str | None = _resolve_anthropic_base_url(env)
+    if anthropic_base_url is not None:
+        overrides["llm_client"]["base_url"] = anthropic_base_url
+
+    # 第三阶段：合并为新的配置对象
+    top_level: Dict[str, object] = overrides[""]
+    for section in _SECTIONS:
+        if len(overrides[section]) > 0:
+            top_level[section] = replace(getattr(config, section), **overrides[section])
+    return replace(config, **top_level)
+
+
+def _resolve_anthropic_base_url(env: Dict[str, str]) -> str | None:
+    """解析Anthropic专用基础URL。
 
     参数:
-        config: 原始AstGrepConfig配置对象。
+        env: 环境变量快照。
 
     返回值:
-        覆盖后的AstGrepConfig配置对象。
+        需要覆盖的基础URL，未配置时返回None。
 
     关键实现细节:
-        patterns支持以逗号分隔的环境变量形式。
+        优先使用 ANTHROPIC_BASE_URL，其次按 ANTHROPIC_REGION 选择国内或国际地址。
     """
 
-    patterns_value: List[str] = config.patterns
-    env_patterns: str | None = os.getenv("AST_GREP_PATTERNS")
-    if env_patterns is not None:
-        patterns_value = [item.strip() for item in env_patterns.split(",") if item.strip() != ""]
-
-    return AstGrepConfig(
-        enable=_override_bool("AST_GREP_ENABLE", config.enable),
-        command=_override_str("AST_GREP_COMMAND", config.command),
-        language=_override_str("AST_GREP_LANGUAGE", config.language),
-        patterns=patterns_value,
-    )
+    anthropic_base: str | None = _coerce_str(env.get("ANTHROPIC_BASE_URL", ""))
+    if anthropic_base is not None:
+        return anthropic_base
+    region: str = env.get("ANTHROPIC_REGION", "").strip().lower()
+    if region in {"domestic", "cn", "china"}:
+        return "https://api.minimaxi.com/anthropic"
+    if region in {"international", "intl", "global"}:
+        return "https://api.minimax.io/anthropic"
+    return None
 
 
-def _override_text_type(config: TextTypeConfig) -> TextTypeConfig:
-    """覆盖文本类型检测配置。
+def _coerce_int(raw: str) -> int:
+    """将环境变量取值解析为整数。
 
     参数:
-        config: 原始TextTypeConfig配置对象。
+        raw: 环境变量原始字符串。
 
     返回值:
-        覆盖后的TextTypeConfig配置对象。
+        整数值。
 
     关键实现细节:
-        正则配置仅在环境变量存在时覆盖。
+        非法取值直接抛出异常，避免错误配置被静默忽略。
     """
 
-    return TextTypeConfig(
-        min_score=_override_int("TEXT_TYPE_MIN_SCORE", config.min_score),
-        line_ratio_divisor=_override_int("TEXT_TYPE_LINE_RATIO_DIVISOR", config.line_ratio_divisor),
-        keyword_weight=_override_int("TEXT_TYPE_KEYWORD_WEIGHT", config.keyword_weight),
-        symbol_weight=_override_int("TEXT_TYPE_SYMBOL_WEIGHT", config.symbol_weight),
-        line_weight=_override_int("TEXT_TYPE_LINE_WEIGHT", config.line_weight),
-        keyword_pattern=_override_str("TEXT_TYPE_KEYWORD_PATTERN", config.keyword_pattern),
-        symbol_pattern=_override_str("TEXT_TYPE_SYMBOL_PATTERN", config.symbol_pattern),
-        line_start_pattern=_override_str("TEXT_TYPE_LINE_START_PATTERN", config.line_start_pattern),
-        call_like_pattern=_override_str("TEXT_TYPE_CALL_LIKE_PATTERN", config.call_like_pattern),
-        comment_pattern=_override_str("TEXT_TYPE_COMMENT_PATTERN", config.comment_pattern),
-    )
-
-
-def _override_llm_client(config: LlmClientConfig) -> LlmClientConfig:
-    """覆盖LLM客户端配置。
-
-    参数:
-        config: 原始LlmClientConfig配置对象。
-
-    返回值:
-        覆盖后的LlmClientConfig配置对象。
+    return int(raw)
 
-    关键实现细节:
-        enable开关允许通过环境变量快速切换。
-    """
 
-    # 先读取通用覆盖值
-    enable = _override_bool("LLM_ENABLE", config.enable)
-    base_url = _override_str("LLM_BASE_URL", config.base_url)
-    api_key_env = _override_str("LLM_API_KEY_ENV", config.api_key_env)
-    model = _override_str("LLM_MODEL", config.model)
-    timeout_seconds = _override_int("LLM_TIMEOUT_SECONDS", config.timeout_seconds)
-    max_retries = _override_int("LLM_MAX_RETRIES", config.max_retries)
-
-    # 支持Anthropic按地理位置选择基础URL：优先使用 ANTHROPIC_BASE_URL
-    anthropic_base: str = _override_str("ANTHROPIC_BASE_URL", "")
-    if anthropic_base.strip() != "":
-        base_url = anthropic_base
-    else:
-        region: str = _override_str("ANTHROPIC_REGION", "").strip().lower()
-        if region in {"domestic", "cn", "china"}:
-            base_url = "https://api.minimaxi.com/anthropic"
-        elif region in {"international", "intl", "global"}:
-            base_url = "https://api.minimax.io/anthropic"
-
-    return LlmClientConfig(
-        enable=enable,
-        base_url=base_url,
-        api_key_env=api_key_env,
-        generate_path=_override_str("LLM_GENERATE_PATH", getattr(config, "generate_path", "")),
-        auth_type=_override_str("LLM_AUTH_TYPE", getattr(config, "auth_type", "bearer")),
-        model=model,
-        timeout_seconds=timeout_seconds,
-        max_retries=max_retries,
-    )
-
-
-def _override_perplexity(config: PerplexityConfig) -> PerplexityConfig:
-    """覆盖困惑度配置。
+def _coerce_bool(raw: str) -> bool | None:
+    """将环境变量取值解析为布尔值。
 
     参数:
-        config: 原始PerplexityConfig配置对象。
+        raw: 环境变量原始字符串。
 
     返回值:
-        覆盖后的PerplexityConfig配置对象。
+        布尔值，无法识别时返回None表示不覆盖。
 
     关键实现细节:
-        支持通过环境变量启用与替换字段名。
+        支持true/false/1/0/yes/no等常见形式。
     """
 
-    return PerplexityConfig(
-        enable=_override_bool("PERPLEXITY_ENABLE", config.enable),
-        endpoint=_override_str("PERPLEXITY_ENDPOINT", config.endpoint),
-        text_field=_override_str("PERPLEXITY_TEXT_FIELD", config.text_field),
-        logprobs_field=_override_str("PERPLEXITY_LOGPROBS_FIELD", config.logprobs_field),
-    )
+    normalized: str = raw.strip().lower()
+    if normalized in {"1", "true", "yes", "y", "on"}:
+        return True
+    if normalized in {"0", "false", "no", "n", "off"}:
+        return False
+    return None
 
 
-def _override_int(env_key: str, default_value: int) -> int:
-    """从环境变量读取整数覆盖值。
+def _coerce_str(raw: str) -> str | None:
+    """将环境变量取值解析为字符串。
 
     参数:
-        env_key: 环境变量名。
-        default_value: 默认值。
+        raw: 环境变量原始字符串。
 
     返回值:
-        覆盖后的整数值。
+        字符串，空白取值返回None表示不覆盖。
 
     关键实现细节:
-        仅在环境变量存在时覆盖。
+        仅在取值非空时覆盖。
     """
 
-    raw: str | None = os.getenv(env_key)
-    if raw is None:
-        return default_value
-    return int(raw)
+    if raw.strip() == "":
+        return None
+    return raw
 
 
-def _override_bool(env_key: str, default_value: bool) -> bool:
-    """从环境变量读取布尔覆盖值。
+def _coerce_tuple(raw: str) -> Tuple[str, ...] | None:
+    """将环境变量取值解析为字符串元组。
 
     参数:
-        env_key: 环境变量名。
-        default_value: 默认值。
+        raw: 以逗号分隔的环境变量原始字符串。
 
     返回值:
-        覆盖后的布尔值。
+        去除空白项后的字符串元组。
 
     关键实现细节:
-        支持true/false/1/0/yes/no等常见形式。
+        与原有patterns覆盖规则一致，变量存在即覆盖。
     """
 
-    raw: str | None = os.getenv(env_key)
-    if raw is None:
-        return default_value
-    normalized: str = raw.strip().lower()
-    if normalized in {"1", "true", "yes", "y", "on"}:
-        return True
-    if normalized in {"0", "false", "no", "n", "off"}:
-        return False
-    return default_value
-
+    return tuple(item.strip() for item in raw.split(",") if item.strip() != "")
 
-def _override_str(env_key: str, default_value: str) -> str:
-    """从环境变量读取字符串覆盖值。
 
-    参数:
-        env_key: 环境变量名。
-        default_value: 默认值。
-
-    返回值:
-        覆盖后的字符串。
-
-    关键实现细节:
-        仅在环境变量存在且非空时覆盖。
-    """
-
-    raw: str | None = os.getenv(env_key)
-    if raw is None:
-        return default_value
-    if raw.strip() == "":
-        return default_value
-    return raw
+# 取值类型到解析函数的映射，解析结果为None时表示不覆盖
+_COERCERS: Dict[str, Callable[[str], object | None]] = {
+    "int": _coerce_int,
+    "bool": _coerce_bool,
+    "str": _coerce_str,
+    "tuple": _coerce_tuple,
+}
@@ -5,8 +5,10 @@
 
 from __future__ import annotations
 
+from typing import List, Tuple
+
 from .llm_client import LlmClient
-from .types import Plan
+from .types import Plan, PromptParts
 
 
 class TextGenerator:
@@ -51,48 +53,54 @@ class TextGenerator:
             生成的长文本。
 
         关键实现细节:
-            以分段方式拼接输出，保证结构清晰。
+            以分段方式拼接输出，保证结构清晰；每段由单个f-string一次构建，避免逐次拼接产生中间字符串；
+            启用LLM时以各规划条目的提示词前后缀经 LlmClient.generate_many 并发请求。
         """
 
         if self._enable_llm:
-            prompt: str = self._build_prompt(instruction, plan)
-            return self._client.generate(prompt)
+            prompts: List[PromptParts] = [(item.prefix, item.suffix) for item in plan]
+            return "\n".join(self._client.generate_many(prompts))
 
         sections: list[str] = []
         for item in plan:
-            index_value: int = int(item["index"])
-            summary_value: str = str(item["summary"])
-            chunk_value: str = str(item["chunk"])
             sections.append(
-                "【第" + str(index_value + 1) + "部分】\n" +
-                "指令: " + instruction + "\n" +
-                "摘要: " + summary_value + "\n" +
-                "内容: " + chunk_value + "\n"
+                f"【第{item.index + 1}部分】\n"
+                f"指令: {instruction}\n"
+                f"摘要: {item.summary}\n"
+                f"内容: {item.chunk}\n"
             )
         return "\n".join(sections)
 
-    def _build_prompt(self, instruction: str, plan: Plan) -> str:
-        """构建LLM提示词。
+    def generate_text_with_logprobs(
+        self,
+        plan: Plan,
+        logprobs_field: str,
+    ) -> Tuple[str, List[float] | None]:
+        """根据规划生成长文本，并随生成响应取回token对数概率。
 
         参数:
-            instruction: 任务指令。
             plan: 规划条目列表。
+            logprobs_field: 响应中对数概率列表字段名。
 
         返回值:
-            用于LLM生成的提示词。
+            生成的长文本与全部分段的对数概率列表；任一分段缺失时对数概率为None。
 
         关键实现细节:
-            将规划条目作为结构化上下文拼接。
+            仅在启用LLM时可用，困惑度打分不再需要额外的网络往返。
         """
 
-        lines: list[str] = ["任务指令:", instruction, "", "规划:"]
-        for item in plan:
-            lines.append(
-                "- index="
-                + str(item["index"])
-                + " summary="
-                + str(item["summary"])
-            )
-        lines.append("")
-        lines.append("请基于规划生成完整长文本。")
-        return "\n".join(lines)
+        if self._enable_llm is False:
+            raise RuntimeError("未启用LLM生成，无法获取对数概率")
+
+        prompts: List[PromptParts] = [(item.prefix, item.suffix) for item in plan]
+        results: List[Tuple[str, List[float] | None]] = self._client.generate_and_score_many(
+            prompts,
+            logprobs_field,
+        )
+        texts: List[str] = [text for text, _ in results]
+        logprobs: List[float] = []
+        for _, section_logprobs in results:
+            if section_logprobs is None:
+                return "\n".join(texts), None
+            logprobs.extend(section_logprobs)
+        return "\n".join(texts), logprobs
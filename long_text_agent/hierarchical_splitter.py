@@ -9,6 +9,24 @@ from __future__ import annotations
 import re
 from typing import List
 
+# 标题识别正则：Markdown标题、“第X章/节/篇”、“一、”式编号与“（一）”式编号合并为单一分支匹配
+_NUMBERED_HEADING: str = (
+    r"第[一二三四五六七八九十0-9]+[章节篇]"
+    r"|[一二三四五六七八九十0-9]+[、.．]"
+    r"|（[一二三四五六七八九十0-9]+）"
+)
+_HEADING_RE: re.Pattern[str] = re.compile(r"^(?:#{1,6}\s+|" + _NUMBERED_HEADING + ")")
+# str.splitlines 识别的全部行分隔符（正则字符类片段）
+_LINE_BREAKS: str = r"\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029"
+# 全文扫描版本：在文本开头及任一行分隔符之后锚定，跳过行内空白（不含行分隔符），
+# Markdown标题要求井号后空白之后仍有内容，与 splitlines 后逐行strip的判定一致
+_HEADING_LINE_RE: re.Pattern[str] = re.compile(
+    r"(?:^|(?<=[" + _LINE_BREAKS + r"]))"
+    r"[^\S" + _LINE_BREAKS + r"]*"
+    r"(?:#{1,6}[^\S" + _LINE_BREAKS + r"]+(?=\S)|" + _NUMBERED_HEADING + ")"
+)
+_PARAGRAPH_RE: re.Pattern[str] = re.compile(r"\n\s*\n")
+
 
 class HierarchicalSplitter:
     """层次化语义拆分器。
@@ -33,13 +51,12 @@ class HierarchicalSplitter:
             切块后的文本列表。
 
         关键实现细节:
-            当检测到标题时使用标题分段，否则使用段落分段。
+            当检测到标题时使用标题分段，否则使用段落分段；是否存在标题由一次全文正则扫描决定，
+            无标题时不再构建行列表。
         """
 
-        lines: List[str] = text.splitlines()
-        has_heading: bool = any(self._is_heading(line) for line in lines)
-        if has_heading:
-            return self._split_by_heading(lines)
+        if _HEADING_LINE_RE.search(text) is not None:
+            return self._split_by_heading(text.splitlines())
         return self._split_by_paragraph(text)
 
     def _split_by_heading(self, lines: List[str]) -> List[str]:
@@ -84,7 +101,7 @@ class HierarchicalSplitter:
 
         paragraphs: List[str] = [
             paragraph.strip()
-            for paragraph in re.split(r"\n\s*\n", text)
+            for paragraph in _PARAGRAPH_RE.split(text)
         ]
         return [paragraph for paragraph in paragraphs if paragraph != ""]
 
@@ -98,18 +115,7 @@ class HierarchicalSplitter:
             是否为标题。
 
         关键实现细节:
-            支持Markdown标题与常见中文层级标题格式。
+            支持Markdown标题与常见中文层级标题格式，各格式合并为一个分支正则，每行只做一次匹配。
         """
 
-        stripped: str = line.strip()
-        if stripped == "":
-            return False
-        if re.match(r"^#{1,6}\s+", stripped) is not None:
-            return True
-        if re.match(r"^第[一二三四五六七八九十0-9]+[章节篇]", stripped) is not None:
-            return True
-        if re.match(r"^[一二三四五六七八九十0-9]+[、.．]\s*", stripped) is not None:
-            return True
-        if re.match(r"^（[一二三四五六七八九十0-9]+）", stripped) is not None:
-            return True
-        return False
+        return _HEADING_RE.match(line.strip()) is not None
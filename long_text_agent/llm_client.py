@@ -5,44 +5,75 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-import math
+from concurrent.futures import ThreadPoolExecutor
+import json
 import os
 from pathlib import Path
-import time
-from typing import Dict, List
+from typing import Callable, Dict, List, Tuple, TypeVar
 
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from .cache import LruCache, text_digest
+from .llm_config import LlmClientConfig
+from .perplexity import compute_perplexity
+from .types import PromptParts
 
-@dataclass(frozen=True)
-class LlmClientConfig:
-    """LLM客户端配置。
+# 连接池缓存的主机数：生成端点与困惑度端点可能位于不同主机
+_POOL_CONNECTIONS: int = 10
+_BatchResult = TypeVar("_BatchResult")
+
+# 提示词公共前缀与分段后缀之间的分隔符
+_PROMPT_SEPARATOR: str = "\n---\n"
+# prompt 协议下请求的对数概率候选数（OpenAI completions 语义为整数）
+_PROMPT_LOGPROBS: int = 1
+
+# 视为瞬时错误并自动重试的HTTP状态码
+_RETRY_STATUS_CODES: Tuple[int, ...] = (429, 500, 502, 503, 504)
+# 重试退避系数：第n次重试前等待 backoff_factor * 2^(n-1) 秒
+_RETRY_BACKOFF_FACTOR: float = 0.5
+# 单次退避等待的上限秒数
+_RETRY_BACKOFF_MAX: float = 8.0
+
+# 与请求参数无关的4xx状态码：鉴权失败、地址错误、超时与限流，不据此判定后端拒绝logprobs参数
+_NON_PARAMETER_CLIENT_ERRORS: Tuple[int, ...] = (401, 403, 404, 408, 429)
+
+# 进程内是否已加载过.env文件
+_DOTENV_LOADED: bool = False
+
+
+class _ApiStatusError(RuntimeError):
+    """API返回错误状态码。
 
     参数:
-        enable: 是否启用API调用。
-        base_url: API基础地址。
-        api_key_env: API密钥的环境变量名。
-        model: 模型标识。
-        timeout_seconds: 请求超时时间。
-        max_retries: 最大重试次数。
+        message: 错误信息。
+        status_code: HTTP状态码。
 
     返回值:
-        不直接返回，作为配置对象供客户端使用。
+        不直接返回，作为异常抛出。
 
     关键实现细节:
-        通过环境变量加载密钥，避免硬编码。
+        继承 RuntimeError，对外表现与其他API调用失败一致，仅供客户端内部按状态码分支。
     """
 
-    enable: bool
-    base_url: str
-    api_key_env: str
-    model: str
-    timeout_seconds: int
-    max_retries: int
-    generate_path: str
-    auth_type: str
+    def __init__(self, message: str, status_code: int) -> None:
+        """初始化异常。
+
+        参数:
+            message: 错误信息。
+            status_code: HTTP状态码。
+
+        返回值:
+            无。
+
+        关键实现细节:
+            保留状态码供调用方判断是否可降级重试。
+        """
+
+        super().__init__(message)
+        self.status_code: int = status_code
 
 
 class LlmClient:
@@ -68,12 +99,94 @@ class LlmClient:
             无。
 
         关键实现细节:
-            初始化阶段读取.env环境变量。
+            .env环境变量每个进程仅由首个客户端读取一次。
+            生成接口URL在此确定，鉴权请求头在首次请求时构建并缓存。
+            会话适配器按并发度设定连接池大小，并发分段请求都能复用长连接。
+            连接错误与瞬时状态码的重试及指数退避交给urllib3的Retry处理，不在Python层循环休眠。
+            服务端返回 Retry-After 时按其等待；重试耗尽后返回最后一次响应，由调用方按状态码报错。
+            cache_size 为正数时创建进程内生成结果缓存，否则不缓存。
+            响应结构由生成接口URL决定，文本提取函数在此一次选定。
         """
 
+        global _DOTENV_LOADED
         self._config: LlmClientConfig = config
-        load_dotenv()
-        self._session = requests.Session()
+        if not _DOTENV_LOADED:
+            load_dotenv()
+            _DOTENV_LOADED = True
+        self._session: requests.Session = requests.Session()
+        retry: Retry = Retry(
+            total=config.max_retries,
+            backoff_factor=_RETRY_BACKOFF_FACTOR,
+            status_forcelist=_RETRY_STATUS_CODES,
+            allowed_methods=frozenset(["POST"]),
+            backoff_max=_RETRY_BACKOFF_MAX,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter: HTTPAdapter = HTTPAdapter(
+            pool_connections=_POOL_CONNECTIONS,
+            pool_maxsize=config.max_concurrency,
+            max_retries=retry,
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._generate_url: str = self._build_generate_url()
+        self._extract_text_direct: Callable[[Dict[str, object]], str | None] = self._select_text_extractor(
+            self._generate_url
+        )
+        self._auth_headers: Dict[str, str] | None = None
+        self._logprobs_rejected: bool = False
+        self._generate_cache: LruCache[str] | None = None
+        if config.cache_size > 0:
+            self._generate_cache = LruCache(config.cache_size)
+
+    def reload_credentials(self) -> None:
+        """丢弃已缓存的鉴权请求头。
+
+        参数:
+            无。
+
+        返回值:
+            无。
+
+        关键实现细节:
+            下一次请求会重新读取API密钥，适用于运行期间轮换密钥的场景。
+        """
+
+        self._auth_headers = None
+
+    def _get_auth_headers(self) -> Dict[str, str]:
+        """获取鉴权请求头。
+
+        参数:
+            无。
+
+        返回值:
+            请求头字典。
+
+        关键实现细节:
+            首次调用时读取密钥并构建请求头，之后直接复用，避免每次请求重复读取环境变量与密钥文件；
+            未启用客户端时不会触发密钥读取。
+        """
+
+        if self._auth_headers is None:
+            self._auth_headers = self._build_auth_headers(self._read_api_key())
+        return self._auth_headers
+
+    def close(self) -> None:
+        """关闭底层HTTP会话。
+
+        参数:
+            无。
+
+        返回值:
+            无。
+
+        关键实现细节:
+            释放连接池中的全部长连接，关闭后客户端不应再发起请求。
+        """
+
+        self._session.close()
 
     def _read_api_key(self) -> str:
         """读取API密钥。
@@ -158,21 +271,32 @@ class LlmClient:
             return base + "/v1/messages"
         return base
 
-    def _build_generate_payload(self, request_url: str, prompt: str) -> Dict[str, object]:
+    def _build_generate_payload(
+        self,
+        request_url: str,
+        prompt: PromptParts,
+        request_logprobs: bool,
+    ) -> Dict[str, object]:
         """构建生成请求体。
 
         参数:
             request_url: 最终请求URL。
-            prompt: 输入提示词。
+            prompt: 提示词（公共前缀, 分段后缀）。
+            request_logprobs: 是否要求响应附带token对数概率。
 
         返回值:
             请求体字典。
 
         关键实现细节:
-            对 OpenAI 兼容路径（如 `/chat/completions`）使用 `messages`，
-            其余路径保留 `prompt` 协议。
+            对 OpenAI 兼容路径（如 `/chat/completions`）使用 `messages` 并开启流式响应，
+            其余路径保留 `prompt` 协议；Messages 协议不支持对数概率，不附加该字段。
+            对数概率字段按协议取值：chat/completions 为布尔开关，prompt 协议沿用
+            OpenAI completions 的整数语义（返回候选数），取1即只要求采样token自身的对数概率。
+            Messages 协议下前缀作为独立文本块并标记 `cache_control`，显式启用提示词缓存；
+            其余协议以固定分隔符拼接，公共前缀始终位于最前，便于服务端自动前缀缓存。
         """
 
+        prefix, suffix = prompt
         lowered_url: str = request_url.lower()
         if "/anthropic/v1/messages" in lowered_url or lowered_url.endswith("/v1/messages"):
             return {
@@ -181,24 +305,60 @@ class LlmClient:
                 "messages": [
                     {
                         "role": "user",
-                        "content": prompt,
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": prefix,
+                                "cache_control": {"type": "ephemeral"},
+                            },
+                            {
+                                "type": "text",
+                                "text": suffix,
+                            },
+                        ],
                     }
                 ],
             }
+        joined_prompt: str = prefix + _PROMPT_SEPARATOR + suffix
+        payload: Dict[str, object] = {"model": self._config.model}
         if "/chat/completions" in lowered_url:
-            return {
-                "model": self._config.model,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
-            }
-        return {
-            "model": self._config.model,
-            "prompt": prompt,
-        }
+            payload["messages"] = [
+                {
+                    "role": "user",
+                    "content": joined_prompt,
+                }
+            ]
+            payload["stream"] = True
+            if request_logprobs:
+                payload["logprobs"] = True
+        else:
+            payload["prompt"] = joined_prompt
+            if request_logprobs:
+                payload["logprobs"] = _PROMPT_LOGPROBS
+        return payload
+
+    def _select_text_extractor(self, request_url: str) -> Callable[[Dict[str, object]], str | None]:
+        """按生成接口URL选定响应文本的直接提取函数。
+
+        参数:
+            request_url: 最终请求URL。
+
+        返回值:
+            直接提取函数，响应结构不符时返回None。
+
+        关键实现细节:
+            URL判定规则与 `_build_generate_payload` 一致：Messages 协议、`/chat/completions`、
+            `/completions` 各自对应固定的响应路径，其余接口读取顶层 `text` 字段。
+        """
+
+        lowered_url: str = request_url.lower()
+        if "/anthropic/v1/messages" in lowered_url or lowered_url.endswith("/v1/messages"):
+            return _extract_messages_text
+        if "/chat/completions" in lowered_url:
+            return _extract_chat_text
+        if "/completions" in lowered_url:
+            return _extract_completion_text
+        return _extract_plain_text
 
     def _extract_generated_text(self, data: Dict[str, object]) -> str:
         """从响应中提取文本。
@@ -210,11 +370,16 @@ class LlmClient:
             提取到的文本。
 
         关键实现细节:
-            兼容两类响应：
+            先按初始化时选定的响应路径直接取值，命中时省去逐层类型判断；
+            未命中时回退到通用解析，兼容两类响应：
             1) 传统 `text` 字段；
             2) OpenAI 风格 `choices[0].message.content` 或 `choices[0].text`。
         """
 
+        direct_text: str | None = self._extract_text_direct(data)
+        if direct_text is not None:
+            return direct_text
+
         text_value: object = data.get("text")
         if isinstance(text_value, str) and text_value.strip() != "":
             return text_value
@@ -228,9 +393,9 @@ class LlmClient:
                     content_obj: object = message_obj.get("content")
                     if isinstance(content_obj, str) and content_obj.strip() != "":
                         return content_obj
-                direct_text: object = first_choice.get("text")
-                if isinstance(direct_text, str) and direct_text.strip() != "":
-                    return direct_text
+                choice_text: object = first_choice.get("text")
+                if isinstance(choice_text, str) and choice_text.strip() != "":
+                    return choice_text
 
         content_value: object = data.get("content")
         if isinstance(content_value, list) and len(content_value) > 0:
@@ -242,47 +407,271 @@ class LlmClient:
 
         raise RuntimeError("响应缺少可解析文本字段")
 
-    def generate(self, prompt: str) -> str:
-        """调用API生成文本。
+    def _extract_logprobs(self, data: Dict[str, object], logprobs_field: str) -> List[float] | None:
+        """从生成响应中提取token对数概率。
 
         参数:
-            prompt: 输入提示词。
+            data: JSON响应字典。
+            logprobs_field: 顶层对数概率列表字段名。
 
         返回值:
-            生成文本。
+            对数概率列表，响应未附带时返回None。
 
         关键实现细节:
-            使用简单的JSON协议，要求响应包含text字段。
+            兼容三类响应：
+            1) 顶层 `logprobs_field` 字段直接给出列表；
+            2) OpenAI chat 风格 `choices[0].logprobs.content[*].logprob`；
+            3) OpenAI completions 风格 `choices[0].logprobs.token_logprobs`，跳过其中的空值。
+        """
+
+        direct_value: object = data.get(logprobs_field)
+        if isinstance(direct_value, list) and len(direct_value) > 0:
+            return [float(value) for value in direct_value]
+
+        choices_value: object = data.get("choices")
+        if isinstance(choices_value, list) and len(choices_value) > 0:
+            first_choice: object = choices_value[0]
+            if isinstance(first_choice, dict):
+                logprobs_obj: object = first_choice.get("logprobs")
+                if isinstance(logprobs_obj, dict):
+                    content_obj: object = logprobs_obj.get("content")
+                    if isinstance(content_obj, list) and len(content_obj) > 0:
+                        return [
+                            float(entry["logprob"])
+                            for entry in content_obj
+                            if isinstance(entry, dict) and "logprob" in entry
+                        ]
+                    token_logprobs_obj: object = logprobs_obj.get("token_logprobs")
+                    if isinstance(token_logprobs_obj, list) and len(token_logprobs_obj) > 0:
+                        return [float(value) for value in token_logprobs_obj if value is not None]
+        return None
+
+    def _request_generation(self, prompt: PromptParts, request_logprobs: bool) -> Dict[str, object]:
+        """发送生成请求并返回原始响应。
+
+        参数:
+            prompt: 提示词（公共前缀, 分段后缀）。
+            request_logprobs: 是否要求响应附带token对数概率。
+
+        返回值:
+            JSON响应字典。
+
+        关键实现细节:
+            统一处理鉴权与超时，供纯生成与生成+打分两条路径复用；瞬时错误的重试与退避由会话适配器完成。
+            响应体直接按字节解析，跳过 requests 的文本编码探测。请求体开启流式时按SSE事件逐条读取，
+            超时作用于相邻数据块之间而非整段生成，读取完毕后关闭响应以归还连接。
         """
 
         if self._config.enable is False:
             raise RuntimeError("LLM客户端未启用")
 
-        api_key: str = self._read_api_key()
-        headers: Dict[str, str] = self._build_auth_headers(api_key)
-        request_url: str = self._build_generate_url()
-        payload: Dict[str, object] = self._build_generate_payload(request_url, prompt)
-
-        last_error: str = ""
-        for attempt in range(self._config.max_retries + 1):
-            try:
-                response: requests.Response = self._session.post(
-                    request_url,
-                    headers=headers,
-                    json=payload,
-                    timeout=self._config.timeout_seconds,
-                    allow_redirects=True,
+        headers: Dict[str, str] = self._get_auth_headers()
+        payload: Dict[str, object] = self._build_generate_payload(
+            self._generate_url,
+            prompt,
+            request_logprobs,
+        )
+        stream: bool = payload.get("stream") is True
+
+        try:
+            response: requests.Response = self._session.post(
+                self._generate_url,
+                headers=headers,
+                data=_encode_json(payload),
+                timeout=self._config.timeout_seconds,
+                allow_redirects=True,
+                stream=stream,
+            )
+        except requests.RequestException as exc:
+            raise RuntimeError("API调用失败: " + str(exc)) from exc
+        try:
+            if response.status_code >= 400:
+                raise _ApiStatusError(
+                    f"API调用失败: status={response.status_code} url={response.url} body={response.text}",
+                    response.status_code,
                 )
-                if response.status_code >= 400:
-                    last_error = f"status={response.status_code} url={response.url} body={response.text}"
-                    time.sleep(min(2 ** attempt, 8))
-                    continue
-                data: Dict[str, object] = response.json()
-                return self._extract_generated_text(data)
-            except requests.RequestException as exc:
-                last_error = str(exc)
-                time.sleep(min(2 ** attempt, 8))
-        raise RuntimeError("API调用失败: " + last_error)
+            if stream and response.headers.get("Content-Type", "").startswith("text/event-stream"):
+                return self._read_event_stream(response)
+            return json.loads(response.content)
+        except (requests.RequestException, ValueError) as exc:
+            # ValueError 覆盖非JSON响应体与格式错误的SSE事件（json.JSONDecodeError）
+            raise RuntimeError("API调用失败: " + str(exc)) from exc
+        finally:
+            response.close()
+
+    def _read_event_stream(self, response: requests.Response) -> Dict[str, object]:
+        """读取OpenAI兼容的SSE流式响应。
+
+        参数:
+            response: 以流式方式打开的响应。
+
+        返回值:
+            与非流式响应结构一致的JSON响应字典。
+
+        关键实现细节:
+            逐行解析 `data:` 事件，累积 `choices[0].delta.content` 与 `choices[0].logprobs.content`，
+            遇到 `[DONE]` 后不再处理事件；结果组装为 `choices[0].message.content` 结构，
+            复用同一套文本与对数概率提取逻辑。
+            `[DONE]` 之后仍读到响应体结束，分块编码的终止块被消费后连接才能归还连接池，
+            提前中断会使关闭响应时直接断开连接。
+        """
+
+        text_parts: List[str] = []
+        logprob_entries: List[object] = []
+        done: bool = False
+        for raw_line in response.iter_lines():
+            if done or not raw_line.startswith(b"data:"):
+                continue
+            event_data: bytes = raw_line[5:].strip()
+            if event_data == b"[DONE]":
+                done = True
+                continue
+            event: object = json.loads(event_data)
+            if not isinstance(event, dict):
+                continue
+            if "error" in event:
+                raise RuntimeError("API调用失败: " + json.dumps(event["error"], ensure_ascii=False))
+            choices_value: object = event.get("choices")
+            if not isinstance(choices_value, list) or len(choices_value) == 0:
+                continue
+            first_choice: object = choices_value[0]
+            if not isinstance(first_choice, dict):
+                continue
+            delta_obj: object = first_choice.get("delta")
+            if isinstance(delta_obj, dict):
+                content_obj: object = delta_obj.get("content")
+                if isinstance(content_obj, str):
+                    text_parts.append(content_obj)
+            logprobs_obj: object = first_choice.get("logprobs")
+            if isinstance(logprobs_obj, dict):
+                entries_obj: object = logprobs_obj.get("content")
+                if isinstance(entries_obj, list):
+                    logprob_entries.extend(entries_obj)
+
+        return {
+            "choices": [
+                {
+                    "message": {"content": "".join(text_parts)},
+                    "logprobs": {"content": logprob_entries},
+                }
+            ]
+        }
+
+    def generate(self, prompt: PromptParts) -> str:
+        """调用API生成文本。
+
+        参数:
+            prompt: 提示词（公共前缀, 分段后缀）。
+
+        返回值:
+            生成文本。
+
+        关键实现细节:
+            使用简单的JSON协议，要求响应包含text字段；启用缓存时以（模型, 前缀, 后缀）的摘要为键，
+            相同提示词直接返回已生成的文本，不再发起请求。
+        """
+
+        if self._generate_cache is None:
+            return self._extract_generated_text(self._request_generation(prompt, False))
+
+        cache_key: bytes = text_digest(self._config.model, prompt[0], prompt[1])
+        cached_text: str | None = self._generate_cache.get(cache_key)
+        if cached_text is not None:
+            return cached_text
+        generated_text: str = self._extract_generated_text(self._request_generation(prompt, False))
+        self._generate_cache.put(cache_key, generated_text)
+        return generated_text
+
+    def generate_and_score(self, prompt: PromptParts, logprobs_field: str) -> Tuple[str, List[float] | None]:
+        """在一次请求中生成文本并取回其token对数概率。
+
+        参数:
+            prompt: 提示词（公共前缀, 分段后缀）。
+            logprobs_field: 响应中对数概率列表字段名。
+
+        返回值:
+            生成文本与对数概率列表；后端不支持时对数概率为None。
+
+        关键实现细节:
+            困惑度随生成响应一并返回，省去一次独立的打分往返；
+            返回None时由调用方回退到 score_perplexity。
+            后端以参数类4xx拒绝 logprobs 时，不带该参数重新生成并返回None，
+            同时记住该结果，后续请求不再附带 logprobs。
+        """
+
+        if self._logprobs_rejected:
+            return self.generate(prompt), None
+        try:
+            data: Dict[str, object] = self._request_generation(prompt, True)
+        except _ApiStatusError as exc:
+            if not 400 <= exc.status_code < 500 or exc.status_code in _NON_PARAMETER_CLIENT_ERRORS:
+                raise
+            self._logprobs_rejected = True
+            return self.generate(prompt), None
+        return self._extract_generated_text(data), self._extract_logprobs(data, logprobs_field)
+
+    def generate_many(self, prompts: List[PromptParts]) -> List[str]:
+        """并发调用API批量生成文本。
+
+        参数:
+            prompts: 提示词列表。
+
+        返回值:
+            与提示词一一对应的生成文本列表。
+
+        关键实现细节:
+            复用同一会话的连接池并发发送请求，并发度为 max_concurrency。
+        """
+
+        return self._map_concurrent(self.generate, prompts)
+
+    def generate_and_score_many(
+        self,
+        prompts: List[PromptParts],
+        logprobs_field: str,
+    ) -> List[Tuple[str, List[float] | None]]:
+        """并发调用API批量生成文本并取回对数概率。
+
+        参数:
+            prompts: 提示词列表。
+            logprobs_field: 响应中对数概率列表字段名。
+
+        返回值:
+            与提示词一一对应的（生成文本, 对数概率列表）列表。
+
+        关键实现细节:
+            与 generate_many 共用并发调度，仅替换单次请求函数。
+        """
+
+        return self._map_concurrent(
+            lambda prompt: self.generate_and_score(prompt, logprobs_field),
+            prompts,
+        )
+
+    def _map_concurrent(
+        self,
+        worker: Callable[[PromptParts], _BatchResult],
+        prompts: List[PromptParts],
+    ) -> List[_BatchResult]:
+        """以线程池并发执行请求。
+
+        参数:
+            worker: 针对单个提示词发起请求的函数。
+            prompts: 提示词列表。
+
+        返回值:
+            与提示词一一对应的请求结果列表。
+
+        关键实现细节:
+            线程数取 max_concurrency 与请求数的较小值，与连接池大小一致，避免连接被丢弃；
+            executor.map 保持输入顺序，单个请求时直接调用以避免线程开销。
+        """
+
+        worker_count: int = min(self._config.max_concurrency, len(prompts))
+        if worker_count <= 1:
+            return [worker(prompt) for prompt in prompts]
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
+            return list(executor.map(worker, prompts))
 
     def score_perplexity(
         self,
@@ -309,34 +698,154 @@ class LlmClient:
         if self._config.enable is False:
             raise RuntimeError("LLM客户端未启用")
 
-        api_key: str = self._read_api_key()
-        headers: Dict[str, str] = self._build_auth_headers(api_key)
+        headers: Dict[str, str] = self._get_auth_headers()
         payload: Dict[str, object] = {
             "model": self._config.model,
             text_field: text,
         }
 
-        last_error: str = ""
-        for attempt in range(self._config.max_retries + 1):
-            try:
-                response: requests.Response = self._session.post(
-                    endpoint,
-                    headers=headers,
-                    json=payload,
-                    timeout=self._config.timeout_seconds,
-                    allow_redirects=True,
-                )
-                if response.status_code >= 400:
-                    last_error = response.text
-                    time.sleep(min(2 ** attempt, 8))
-                    continue
-                data: Dict[str, object] = response.json()
-                logprobs: List[float] | None = data.get(logprobs_field) if isinstance(data, dict) else None
-                if logprobs is None or len(logprobs) == 0:
-                    raise RuntimeError("响应缺少logprobs列表")
-                average_logprob: float = sum(logprobs) / float(len(logprobs))
-                return math.exp(-average_logprob)
-            except requests.RequestException as exc:
-                last_error = str(exc)
-                time.sleep(min(2 ** attempt, 8))
-        raise RuntimeError("困惑度API调用失败: " + last_error)
+        try:
+            response: requests.Response = self._session.post(
+                endpoint,
+                headers=headers,
+                data=_encode_json(payload),
+                timeout=self._config.timeout_seconds,
+                allow_redirects=True,
+            )
+        except requests.RequestException as exc:
+            raise RuntimeError("困惑度API调用失败: " + str(exc)) from exc
+        if response.status_code >= 400:
+            raise RuntimeError("困惑度API调用失败: " + response.text)
+        try:
+            data: Dict[str, object] = json.loads(response.content)
+        except ValueError as exc:
+            raise RuntimeError("困惑度API调用失败: " + str(exc)) from exc
+        logprobs: List[float] | None = data.get(logprobs_field) if isinstance(data, dict) else None
+        if logprobs is None:
+            raise RuntimeError("响应缺少logprobs列表")
+        return compute_perplexity(logprobs)
+
+
+def _encode_json(payload: Dict[str, object]) -> bytes:
+    """将请求体序列化为JSON字节串。
+
+    参数:
+        payload: 请求体字典。
+
+    返回值:
+        UTF-8编码的紧凑JSON字节串。
+
+    关键实现细节:
+        关闭ASCII转义并去除分隔符空白：中文提示词每字符按3字节UTF-8发送，
+        而非 requests 默认 json= 参数产生的6字节 \\uXXXX 转义，长提示词的请求体约缩小一半。
+        Content-Type 已由鉴权请求头统一设置。
+        文本含孤立代理字符（如 surrogateescape 解码所得）时无法编码为UTF-8，
+        此时回退为ASCII转义输出，与 requests 的 json= 行为一致，请求照常发送。
+    """
+
+    try:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    except UnicodeEncodeError:
+        return json.dumps(payload, separators=(",", ":")).encode("ascii")
+
+
+def _non_blank_text(value: object) -> str | None:
+    """校验提取到的文本非空。
+
+    参数:
+        value: 响应中取到的值。
+
+    返回值:
+        非空白字符串，否则返回None。
+
+    关键实现细节:
+        isspace 遇到首个非空白字符即返回，无需像 strip 那样复制整段文本。
+    """
+
+    if isinstance(value, str) and value != "" and not value.isspace():
+        return value
+    return None
+
+
+def _extract_plain_text(data: Dict[str, object]) -> str | None:
+    """直接提取顶层 `text` 字段。
+
+    参数:
+        data: JSON响应字典。
+
+    返回值:
+        生成文本，结构不符时返回None。
+
+    关键实现细节:
+        对应默认的 prompt/text 协议。
+    """
+
+    return _non_blank_text(data.get("text"))
+
+
+def _extract_chat_text(data: Dict[str, object]) -> str | None:
+    """直接提取 `choices[0].message.content`。
+
+    参数:
+        data: JSON响应字典。
+
+    返回值:
+        生成文本，结构不符时返回None。
+
+    关键实现细节:
+        对应 OpenAI 兼容的 chat/completions 协议，按固定路径索引，结构不符时由调用方回退；
+        响应同时带有优先级更高的顶层 `text` 字段时也交由通用解析，保证两条路径结果一致。
+    """
+
+    if "text" in data:
+        return None
+    try:
+        return _non_blank_text(data["choices"][0]["message"]["content"])
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def _extract_completion_text(data: Dict[str, object]) -> str | None:
+    """直接提取 `choices[0].text`。
+
+    参数:
+        data: JSON响应字典。
+
+    返回值:
+        生成文本，结构不符时返回None。
+
+    关键实现细节:
+        对应 OpenAI 兼容的 completions 协议；存在优先级更高的字段时交由通用解析。
+    """
+
+    if "text" in data:
+        return None
+    try:
+        first_choice: Dict[str, object] = data["choices"][0]
+        if "message" in first_choice:
+            return None
+        return _non_blank_text(first_choice["text"])
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def _extract_messages_text(data: Dict[str, object]) -> str | None:
+    """直接提取 `content[0].text`。
+
+    参数:
+        data: JSON响应字典。
+
+    返回值:
+        生成文本，结构不符时返回None。
+
+    关键实现细节:
+        对应 Messages 协议；首个内容块不是文本块（如思考块）或存在优先级更高的字段时返回None，
+        由通用解析继续查找。
+    """
+
+    if "text" in data or "choices" in data:
+        return None
+    try:
+        return _non_blank_text(data["content"][0]["text"])
+    except (KeyError, IndexError, TypeError):
+        return None
@@ -0,0 +1,43 @@
+"""LLM客户端配置。
+
+该模块定义LLM客户端的配置结构，不依赖任何HTTP库，仅构建配置时无需加载客户端实现。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class LlmClientConfig:
+    """LLM客户端配置。
+
+    参数:
+        enable: 是否启用API调用。
+        base_url: API基础地址。
+        api_key_env: API密钥的环境变量名。
+        model: 模型标识。
+        timeout_seconds: 请求超时时间。
+        max_retries: 最大重试次数。
+        generate_path: 生成接口路径，为空时按基础地址推断。
+        auth_type: 鉴权方式，bearer或自定义请求头名。
+        max_concurrency: 分段生成的最大并发请求数。
+        cache_size: 生成结果缓存的最大条目数，0表示关闭缓存。
+
+    返回值:
+        不直接返回，作为配置对象供客户端使用。
+
+    关键实现细节:
+        通过环境变量加载密钥，避免硬编码。
+    """
+
+    enable: bool
+    base_url: str
+    api_key_env: str
+    model: str
+    timeout_seconds: int
+    max_retries: int
+    generate_path: str
+    auth_type: str
+    max_concurrency: int
+    cache_size: int
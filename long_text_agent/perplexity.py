@@ -1,11 +1,13 @@
 """困惑度配置模块。
 
-该模块定义用于困惑度计算的配置结构。
+该模块定义用于困惑度计算的配置结构与基于对数概率的困惑度计算。
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass
+import math
+from typing import List
 
 
 @dataclass(frozen=True)
@@ -29,3 +31,23 @@ class PerplexityConfig:
     endpoint: str
     text_field: str
     logprobs_field: str
+
+
+def compute_perplexity(logprobs: List[float]) -> float:
+    """根据token对数概率计算困惑度。
+
+    参数:
+        logprobs: token对数概率列表。
+
+    返回值:
+        困惑度数值。
+
+    关键实现细节:
+        计算 $\exp(-\bar{\ell})$，空列表视为响应异常直接抛出；求和使用 math.fsum，
+        长序列累加不产生舍入误差累积，且求和循环在C层完成。
+    """
+
+    if len(logprobs) == 0:
+        raise RuntimeError("响应缺少logprobs列表")
+    average_logprob: float = math.fsum(logprobs) / float(len(logprobs))
+    return math.exp(-average_logprob)
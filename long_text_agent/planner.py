@@ -10,6 +10,17 @@ from typing import List
 from .config import AgentConfig
 from .types import Plan, PlanItem
 
+# 提示词中与分段无关的固定说明：输出要求与分段信息格式，置于公共前缀以延长可缓存部分
+_PROMPT_DIRECTIVE: str = (
+    "输出要求:\n"
+    "请基于任务指令与其后给出的当前部分信息，生成该部分的完整长文本。\n"
+    "只输出该部分正文，保持与任务指令一致的主题与文风。\n\n"
+    "当前部分信息格式:\n"
+    "当前部分: 第i/n部分，表示该部分在全文中的位置；\n"
+    "摘要: 该部分原始内容的开头摘录；\n"
+    "内容: 该部分的完整原始内容。"
+)
+
 
 class PlanBuilder:
     """规划构建器。
@@ -47,20 +58,32 @@ class PlanBuilder:
             chunks: 切块后的文本列表。
 
         返回值:
-            规划条目列表，每条包含索引、摘要与原始块内容。
+            规划条目列表，每条包含索引、摘要、原始块内容与提示词前后缀。
 
         关键实现细节:
-            通过截断摘要实现最小规划占位。
+            通过截断摘要实现最小规划占位；块长不超过 summary_chars 时切片直接返回原字符串，不产生副本。
+            提示词前缀依次为固定的输出要求与格式说明、任务指令，在全部条目间共享同一字符串，
+            固定说明居首，跨任务指令也能复用同一段缓存前缀；
+            分段特有的位置、摘要与内容全部放在后缀中，逐字节一致的前缀尽量长，以便服务端前缀缓存命中。
         """
 
+        total: int = len(chunks)
+        summary_chars: int = self._config.summary_chars
+        prefix: str = f"{_PROMPT_DIRECTIVE}\n\n任务指令:\n{instruction}"
         plan: Plan = []
         for index, chunk in enumerate(chunks):
-            summary: str = chunk[: self._config.summary_chars]
-            item: PlanItem = {
-                "index": index,
-                "summary": summary,
-                "chunk": chunk,
-                "instruction": instruction,
-            }
+            summary: str = chunk[:summary_chars]
+            item: PlanItem = PlanItem(
+                index=index,
+                summary=summary,
+                chunk=chunk,
+                instruction=instruction,
+                prefix=prefix,
+                suffix=(
+                    f"当前部分: 第{index + 1}/{total}部分\n"
+                    f"摘要: {summary}\n"
+                    f"内容:\n{chunk}"
+                ),
+            )
             plan.append(item)
         return plan
@@ -5,14 +5,18 @@
 
 from __future__ import annotations
 
+from itertools import islice
 import re
-from typing import List
+from typing import List, Tuple
 
 from .ast_grep_splitter import AstGrepSplitter
 from .hierarchical_splitter import HierarchicalSplitter
 
 from .config import AgentConfig
 
+# 句末标点
+_SENTENCE_END_RE: re.Pattern[str] = re.compile(r"[。！？.!?]")
+
 
 class TextSegmenter:
     """文本拆分器。
@@ -37,10 +41,17 @@ class TextSegmenter:
             无。
 
         关键实现细节:
-            保留配置对象供后续拆分流程使用。
+            保留配置对象供后续拆分流程使用；文本类型检测的正则在此一次编译，
+            检测时直接调用编译对象，避免逐行经过 re 模块的缓存查找。
+            行特征正则各自独立编译，不做拼接，保证行内全局标志与编号反向引用按原样生效。
         """
 
         self._config: AgentConfig = config
+        self._keyword_re: re.Pattern[str] = re.compile(config.text_type.keyword_pattern)
+        self._symbol_re: re.Pattern[str] = re.compile(config.text_type.symbol_pattern)
+        self._line_start_re: re.Pattern[str] = re.compile(config.text_type.line_start_pattern)
+        self._call_like_re: re.Pattern[str] = re.compile(config.text_type.call_like_pattern)
+        self._comment_re: re.Pattern[str] = re.compile(config.text_type.comment_pattern)
         self._ast_grep_splitter: AstGrepSplitter | None = None
         if self._config.ast_grep.enable:
             self._ast_grep_splitter = AstGrepSplitter(self._config.ast_grep)
@@ -74,35 +85,26 @@ class TextSegmenter:
                 return self._post_process_chunks(semantic_chunks)
             sentences = self._split_sentences(text)
 
-        # 第一阶段：句子合并成块
+        # 第一阶段：句子合并成块（片段先进入缓冲列表并累计长度，成块时一次拼接）
+        max_chars: int = self._config.max_chunk_chars
         chunks: List[str] = []
-        current_chunk: str = ""
+        buffer_parts: List[str] = []
+        buffer_length: int = 0
         for sentence in sentences:
-            if len(sentence) > self._config.max_chunk_chars:
+            pieces: List[str] = [sentence]
+            if len(sentence) > max_chars:
                 # 第二阶段：过长句子切分
-                split_parts: List[str] = self._split_long_sentence(sentence)
-                for part in split_parts:
-                    if current_chunk == "":
-                        current_chunk = part
-                    elif len(current_chunk) + len(part) <= self._config.max_chunk_chars:
-                        current_chunk = current_chunk + part
-                    else:
-                        chunks.append(current_chunk)
-                        current_chunk = part
-                continue
-
-            if current_chunk == "":
-                current_chunk = sentence
-                continue
-
-            if len(current_chunk) + len(sentence) <= self._config.max_chunk_chars:
-                current_chunk = current_chunk + sentence
-            else:
-                chunks.append(current_chunk)
-                current_chunk = sentence
-
-        if current_chunk != "":
-            chunks.append(current_chunk)
+                pieces = self._split_long_sentence(sentence)
+            for piece in pieces:
+                if buffer_length > 0 and buffer_length + len(piece) > max_chars:
+                    chunks.append("".join(buffer_parts))
+                    buffer_parts.clear()
+                    buffer_length = 0
+                buffer_parts.append(piece)
+                buffer_length += len(piece)
+
+        if buffer_length > 0:
+            chunks.append("".join(buffer_parts))
 
         return self._post_process_chunks(chunks)
 
@@ -116,31 +118,31 @@ class TextSegmenter:
             是否为代码文本。
 
         关键实现细节:
-            通过关键字、符号密度与行特征综合打分。
+            通过关键字、符号密度与行特征综合打分；配置了预筛特征时先做子串查找，
+            一项都不含时跳过全部正则扫描直接判为非代码。预筛有损：不含所列字面量的代码也会被判为非代码，
+            示例配置中保持关闭。
         """
 
+        fast_path_keywords: Tuple[str, ...] = self._config.text_type.fast_path_keywords
+        if len(fast_path_keywords) > 0 and not any(keyword in text for keyword in fast_path_keywords):
+            return False
+
         lines: List[str] = text.splitlines()
         if len(lines) == 0:
             return False
 
-        keyword_pattern: str = self._config.text_type.keyword_pattern
-        symbol_pattern: str = self._config.text_type.symbol_pattern
-        line_start_pattern: str = self._config.text_type.line_start_pattern
-        call_like_pattern: str = self._config.text_type.call_like_pattern
-        comment_pattern: str = self._config.text_type.comment_pattern
-
-        keyword_hits: int = len(re.findall(keyword_pattern, text))
-        symbol_hits: int = len(re.findall(symbol_pattern, text))
+        keyword_hits: int = len(self._keyword_re.findall(text))
+        symbol_hits: int = len(self._symbol_re.findall(text))
         code_like_lines: int = 0
         for line in lines:
             stripped: str = line.strip()
             if stripped == "":
                 continue
-            if re.match(line_start_pattern, stripped) is not None:
+            if self._line_start_re.match(stripped) is not None:
                 code_like_lines += 1
-            if re.match(call_like_pattern, stripped) is not None:
+            if self._call_like_re.match(stripped) is not None:
                 code_like_lines += 1
-            if re.match(comment_pattern, stripped) is not None:
+            if self._comment_re.match(stripped) is not None:
                 code_like_lines += 1
 
         score: int = (
@@ -188,27 +190,18 @@ class TextSegmenter:
             句子列表。
 
         关键实现细节:
-            保留标点以维持语义完整性。
+            保留标点以维持语义完整性；单次扫描句末标点位置，按上一句末尾到本次标点之后直接切片，
+            不再生成交错的中间片段并逐段拼接。
         """
 
-        pattern: str = r"([。！？.!?])"
-        parts: List[str] = re.split(pattern, text)
         sentences: List[str] = []
-        buffer_text: str = ""
-        for part in parts:
-            if part == "":
-                continue
-            if re.match(pattern, part) is not None:
-                buffer_text = buffer_text + part
-                sentences.append(buffer_text)
-                buffer_text = ""
-            else:
-                if buffer_text == "":
-                    buffer_text = part
-                else:
-                    buffer_text = buffer_text + part
-        if buffer_text != "":
-            sentences.append(buffer_text)
+        start_index: int = 0
+        for match in _SENTENCE_END_RE.finditer(text):
+            end_index: int = match.end()
+            sentences.append(text[start_index:end_index])
+            start_index = end_index
+        if start_index < len(text):
+            sentences.append(text[start_index:])
         return sentences
 
     def _split_long_sentence(self, sentence: str) -> List[str]:
@@ -243,14 +236,16 @@ class TextSegmenter:
             应用重叠后的切块列表。
 
         关键实现细节:
-            每个块追加上一个块末尾的若干字符以增强上下文衔接。
+            每个块追加上一个块末尾的若干字符以增强上下文衔接；以相邻块配对的推导式一次构建结果，
+            每个块只做一次两段拼接，不再逐项判断首块与重复读取配置。
         """
 
-        overlapped: List[str] = []
-        for index, chunk in enumerate(chunks):
-            if index == 0:
-                overlapped.append(chunk)
-                continue
-            prefix: str = chunks[index - 1][-self._config.overlap_chars:]
-            overlapped.append(prefix + chunk)
+        if len(chunks) == 0:
+            return []
+        overlap_chars: int = self._config.overlap_chars
+        overlapped: List[str] = [chunks[0]]
+        overlapped.extend(
+            previous[-overlap_chars:] + chunk
+            for previous, chunk in zip(chunks, islice(chunks, 1, None))
+        )
         return overlapped
@@ -31,7 +31,7 @@ class StatsBuilder:
             output_text: 输出文本。
 
         返回值:
-            统计信息字典。
+            统计信息对象。
 
         关键实现细节:
             仅使用输入与输出长度进行统计，不引入隐式依赖。
@@ -40,10 +40,10 @@ class StatsBuilder:
         chunk_count: int = len(chunks)
         average_chunk_length: float = 0.0
         if chunk_count > 0:
-            total_length: int = sum(len(chunk) for chunk in chunks)
+            total_length: int = sum(map(len, chunks))
             average_chunk_length = total_length / float(chunk_count)
-        return {
-            "chunk_count": chunk_count,
-            "average_chunk_length": average_chunk_length,
-            "output_length": len(output_text),
-        }
+        return Stats(
+            chunk_count=chunk_count,
+            average_chunk_length=average_chunk_length,
+            output_length=len(output_text),
+        )
@@ -6,6 +6,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Tuple
 
 
 @dataclass(frozen=True)
@@ -23,6 +24,8 @@ class TextTypeConfig:
         line_start_pattern: 行起始特征匹配正则。
         call_like_pattern: 类似函数声明的行模式正则。
         comment_pattern: 行注释模式正则。
+        fast_path_keywords: 预筛用的字面量特征元组，文本不含其中任一项时直接判定为非代码；为空时关闭预筛。
+            传入列表时在初始化后转换为元组。
 
     返回值:
         不直接返回，作为配置对象供检测逻辑使用。
@@ -41,3 +44,19 @@ class TextTypeConfig:
     line_start_pattern: str
     call_like_pattern: str
     comment_pattern: str
+    fast_path_keywords: Tuple[str, ...]
+
+    def __post_init__(self) -> None:
+        """规范化预筛特征集合。
+
+        参数:
+            无。
+
+        返回值:
+            无。
+
+        关键实现细节:
+            冻结数据类需通过 object.__setattr__ 写入转换后的元组。
+        """
+
+        object.__setattr__(self, "fast_path_keywords", tuple(self.fast_path_keywords))
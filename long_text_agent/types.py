@@ -1,12 +1,67 @@
 """类型定义。
 
-该模块集中定义跨模块共享的类型别名，提升可读性与一致性。
+该模块集中定义跨模块共享的类型与类型别名，提升可读性与一致性。
 """
 
-from typing import Dict, List, Union
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Union
+
+
+@dataclass(slots=True, frozen=True)
+class PlanItem:
+    """规划条目。
+
+    参数:
+        index: 切块索引。
+        summary: 切块摘要。
+        chunk: 原始切块内容。
+        instruction: 任务指令。
+        prefix: 提示词公共前缀，所有条目逐字节一致。
+        suffix: 提示词分段后缀，包含该条目特有的位置、摘要与内容。
+
+    返回值:
+        不直接返回，作为规划单元供生成模块使用。
+
+    关键实现细节:
+        使用slots与类型化字段，访问走固定偏移的属性读取，无需逐次字典查找与类型转换；
+        提示词拆为公共前缀与分段后缀，使各分段请求共享相同前缀以命中服务端前缀缓存。
+    """
+
+    index: int
+    summary: str
+    chunk: str
+    instruction: str
+    prefix: str
+    suffix: str
+
+
+# 提示词由（公共前缀, 分段后缀）两部分组成
+PromptParts = Tuple[str, str]
+
+
+@dataclass(slots=True, frozen=True)
+class Stats:
+    """拆分统计信息。
+
+    参数:
+        chunk_count: 切块数量。
+        average_chunk_length: 平均块长度。
+        output_length: 输出文本长度。
+
+    返回值:
+        不直接返回，作为统计结果随诊断信息输出。
+
+    关键实现细节:
+        字段固定，使用slots存储，访问为固定偏移的属性读取且不为每个实例分配字典。
+    """
+
+    chunk_count: int
+    average_chunk_length: float
+    output_length: int
+
 
-PlanItem = Dict[str, Union[int, str]]
 Plan = List[PlanItem]
 Metrics = Dict[str, Union[int, float, str]]
-Stats = Dict[str, Union[int, float, str]]
 Diagnostics = Dict[str, Union[str, None, Metrics, Stats, Plan]]